@@ -7,15 +7,21 @@ including comprehensive code structure analysis (imports, exports, functions, cl
 Output format: Pipe-delimited (|) records for easy grep searching.
 """
 
+import io
+import json
+import mmap
 import os
 import sys
 import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import List, Tuple, Dict, Optional
-from dataclasses import dataclass, field
+from typing import List, Tuple, Dict, Optional, Set
+from dataclasses import dataclass, field, fields
+from operator import attrgetter
 
 # Directories to exclude from the tree
-EXCLUDE_DIRS = {
+EXCLUDE_DIRS = frozenset({
     'node_modules',
     '.git',
     '.next',
@@ -29,17 +35,31 @@ EXCLUDE_DIRS = {
     'venv',
     'env',
     '.venv',
-}
+})
 
 # File patterns to exclude
-EXCLUDE_FILES = {
+EXCLUDE_FILES = frozenset({
     '.DS_Store',
     'package-lock.json',
     'npm-debug.log',
     'yarn-error.log',
     '.env',
     '.env.local',
-}
+    '.project_map_cache.json',
+    '.project_map_cache.json.tmp',
+})
+
+# Analysis cache (stored in the project root, reused across runs). It is plain
+# JSON - unlike pickle, loading a cache file shipped with a checkout cannot run code.
+CACHE_FILENAME = '.project_map_cache.json'
+# Bump whenever the analysis output changes so stale cache entries are dropped
+CACHE_VERSION = 10
+
+# Files at least this large are memory-mapped instead of read into memory
+MMAP_MIN_SIZE = 64 * 1024
+
+# Below this many files to analyze, starting worker processes costs more than it saves
+PARALLEL_MIN_FILES = 64
 
 # Code file extensions to parse
 CODE_EXTENSIONS = {
@@ -51,7 +71,150 @@ CODE_EXTENSIONS = {
     '.c', '.cpp', '.h', '.hpp',     # C/C++
 }
 
-@dataclass
+def _compile_scanner(constructs: Tuple[Tuple[str, str], ...]) -> re.Pattern:
+    """
+    Compile the constructs of a language into a scanner matched at each keyword (see _scan).
+
+    Every construct is an optional lookahead with its own named group, so
+    constructs that start at the same position (e.g. `export interface Foo`)
+    are all reported by one empty match.
+
+    The scanner is compiled as a bytes pattern, since files are scanned undecoded.
+    """
+    return re.compile(''.join(
+        f"(?:(?=(?P<{name}>{pattern})))?" for name, pattern in constructs
+    ).encode('ascii'))
+
+def _scan(scanner: re.Pattern, keywords: Tuple[bytes, ...], content: bytes):
+    """
+    Yield the scanner's match at every keyword occurrence, in file order.
+
+    The keyword offsets are collected with one find() sweep per keyword - a
+    memchr-driven substring search, much faster than re stepping through the
+    file - and the scanner is only run at those offsets.
+    """
+    offsets = set()
+    for keyword in keywords:
+        pos = content.find(keyword)
+        while pos >= 0:
+            offsets.add(pos)
+            pos = content.find(keyword, pos + 1)
+    match_at = scanner.match
+    for pos in sorted(offsets):
+        yield match_at(content, pos)
+
+def _active_constructs(content: bytes, constructs: Tuple[Tuple[str, Tuple[str, ...], str], ...]) -> Tuple[str, ...]:
+    """
+    Return the names of the constructs whose required literals all occur in the content.
+
+    A construct missing one of its literals cannot match, so the analyzers skip
+    it - and skip the scan altogether when no construct is left.
+    """
+    found = {}
+    active = []
+    for name, literals, _ in constructs:
+        for literal in literals:
+            if literal not in found:
+                # find() rather than `in` - it also works on memory maps
+                found[literal] = content.find(literal) >= 0
+            if not found[literal]:
+                break
+        else:
+            active.append(name)
+    return tuple(active)
+
+# TypeScript/JavaScript constructs, all matched by a single scan over the file:
+# (name, literals a match cannot occur without, pattern)
+_TS_CONSTRUCTS = (
+    ('imp', (b'import', b'from'),
+     r'import\s+.*?\s+from\s+[\'"](?P<imp_path>\.[^\'"]+)[\'"]'),
+    ('exp', (b'export',),
+     r'export\s+(?:const|let|var|function|class|interface|type|enum)\s+(?P<exp_name>\w+)'),
+    ('dflt', (b'export', b'default'),
+     r'export\s+default\s+(?P<dflt_name>\w+)'),
+    ('iface', (b'interface',),
+     r'(?P<iface_exp>export\s+)?interface\s+(?P<iface_name>\w+)'),
+    ('type', (b'type',),
+     r'(?P<type_exp>export\s+)?type\s+(?P<type_name>\w+)'),
+    ('enum', (b'enum',),
+     r'(?P<enum_exp>export\s+)?enum\s+(?P<enum_name>\w+)'),
+    ('cls', (b'class',),
+     r'(?P<cls_exp>export\s+)?class\s+(?P<cls_name>\w+)'),
+    ('func', (b'function',),
+     r'(?P<func_exp>export\s+)?(?P<func_async>async\s+)?function\s+(?P<func_name>\w+)'
+     r'\s*\((?P<func_params>[^)]*)\)(?:\s*:\s*(?P<func_ret>[^\{]+))?\s*\{'),
+    ('arrow', (b'=>',),
+     r'(?P<arrow_exp>export\s+)?(?:const|let|var)\s+(?P<arrow_name>\w+)\s*=\s*(?P<arrow_async>async\s+)?'
+     r'\((?P<arrow_params>[^)]*)\)(?:\s*:\s*(?P<arrow_ret>[^\=\>]+))?\s*=>'),
+)
+_TS_KEYWORDS = (b'import', b'export', b'interface', b'type', b'enum', b'class', b'async', b'function', b'const', b'let', b'var')
+_TS_SCAN_RE = _compile_scanner(tuple((name, pattern) for name, _, pattern in _TS_CONSTRUCTS))
+_TS_TYPE_KINDS = {'iface': 'interface', 'type': 'type', 'enum': 'enum'}
+# A method with a body; the return type stops at `;` and `}` so that it never
+# runs past the end of a member (e.g. a body-less `.d.ts` declaration)
+_TS_METHOD_RE = re.compile(rb'(?:public|private|protected)?\s*(async\s+)?(\w+)\s*\(([^)]*)\)(?:\s*:\s*([^{};]+))?\s*\{')
+# Brackets of a class declaration, plus the comments and string literals whose
+# brackets must be skipped; the `{` opening its body is the first one outside
+# type parameters, extends arguments and the like. `=>` is matched so that its
+# `>` is not taken for a closing angle bracket.
+_TS_CLASS_HEADER_RE = re.compile(
+    rb'=>|[<>(){};]|//[^\n]*|/\*.*?\*/|\'(?:\\.|[^\'\\\n])*\'|"(?:\\.|[^"\\\n])*"|`(?:\\.|[^`\\])*`',
+    re.DOTALL
+)
+# Start of a line up to a `class` word that is inside a comment
+_TS_COMMENT_LINE_RE = re.compile(rb'//|^\s*(?:/\*|\*)')
+# Braces, plus the comments, string and regex literals whose braces must be skipped
+_TS_BRACE_RE = re.compile(
+    rb'[{}]|//[^\n]*|/\*.*?\*/|\'(?:\\.|[^\'\\\n])*\'|"(?:\\.|[^"\\\n])*"|`(?:\\.|[^`\\])*`'
+    rb'|/(?:\\.|\[(?:\\.|[^\]\\\n])*\]|[^/\\\n\[])+/',
+    re.DOTALL
+)
+# Code before a `/` that makes it a division rather than the start of a regex
+# literal: an operand, unless it is one of the keywords that precede expressions
+_TS_DIVISION_PREFIX_RE = re.compile(rb'[\w$)\]]\s*\Z')
+_TS_REGEX_KEYWORD_RE = re.compile(
+    rb'(?:^|[^\w$])(?:return|typeof|instanceof|in|of|case|do|else|new|delete|void|throw|yield|await)\s*\Z'
+)
+
+# Python constructs, matched the same way
+_PY_CONSTRUCTS = (
+    ('imp', (b'from', b'import'),
+     r'from\s+(?P<imp_path>\.[^\s]+)\s+import'),
+    ('cls', (b'class',),
+     r'class\s+(?P<cls_name>\w+)'),
+    ('func', (b'def',),
+     r'(?:async\s+)?def\s+(?P<func_name>\w+)\s*\((?P<func_params>[^)]*)\)(?:\s*->\s*(?P<func_ret>[^:]+))?:'),
+)
+_PY_KEYWORDS = (b'from', b'class', b'async', b'def')
+_PY_SCAN_RE = _compile_scanner(tuple((name, pattern) for name, _, pattern in _PY_CONSTRUCTS))
+_PY_METHOD_RE = re.compile(rb'(?:async\s+)?def\s+(\w+)\s*\(([^)]*)\)(?:\s*->\s*([^:]+))?:')
+# Rest of a class statement up to the `:` that opens its body, including
+# PEP 695 type parameters (`class Foo[T]:`)
+_PY_CLASS_HEADER_RE = re.compile(
+    rb'\s*(?:\[(?:[^\[\]]|\[[^\[\]]*\])*\])?\s*(?:\((?:[^()]|\([^()]*\))*\))?\s*:'
+)
+# First line indented at most N characters that is not blank or a comment, per N
+_PY_DEDENT_RES: Dict[int, re.Pattern] = {}
+# Opening quotes of a triple-quoted string, whose lines never end a block
+_PY_TRIPLE_QUOTE_RE = re.compile(rb"'''|\"\"\"")
+# Indentation of a line that is not blank or a comment
+_PY_STATEMENT_LINE_RE = re.compile(rb'\n([ \t]*)(?=[^ \t\r\n#])')
+
+def _record(cls):
+    """
+    Turn a class into a dataclass with __slots__ (Python 3.10+).
+
+    Records are created for every file and construct, and __slots__ keeps them
+    small and their attribute access fast. They are pickled as a plain
+    constructor call, which is much faster than pickle's generic __slots__
+    handling when analyses are sent back from worker processes.
+    """
+    cls = dataclass(cls, **({'slots': True} if sys.version_info >= (3, 10) else {}))
+    get_fields = attrgetter(*(f.name for f in fields(cls)))
+    cls.__reduce__ = lambda self: (cls, get_fields(self))
+    return cls
+
+@_record
 class FunctionInfo:
     """Information about a function or method."""
     name: str
@@ -59,21 +222,21 @@ class FunctionInfo:
     is_async: bool = False
     is_exported: bool = False
 
-@dataclass
+@_record
 class ClassInfo:
     """Information about a class."""
     name: str
     methods: List[FunctionInfo] = field(default_factory=list)
     is_exported: bool = False
 
-@dataclass
+@_record
 class TypeInfo:
     """Information about TypeScript types/interfaces."""
     name: str
     kind: str  # 'interface', 'type', 'enum'
     is_exported: bool = False
 
-@dataclass
+@_record
 class FileAnalysis:
     """Comprehensive analysis of a code file."""
     imports: List[str] = field(default_factory=list)  # Local imports only
@@ -83,225 +246,354 @@ class FileAnalysis:
     types: List[TypeInfo] = field(default_factory=list)  # interfaces, types, enums
     has_tests: bool = False
 
+@dataclass
+class AnalysisCache:
+    """FileAnalysis results keyed by relative path, with the (mtime_ns, size) they were computed for."""
+    previous: Dict[str, Tuple[int, int, Optional[FileAnalysis]]] = field(default_factory=dict)
+    current: Dict[str, Tuple[int, int, Optional[FileAnalysis]]] = field(default_factory=dict)
+
+@_record
+class IndexEntry:
+    """A file found while walking the project, or a directory that could not be read."""
+    path: str
+    rel_path: str = ""
+    size: int = 0
+    mtime_ns: int = 0
+    is_code: bool = False
+    permission_denied: bool = False
+
 def should_exclude(name: str, is_dir: bool) -> bool:
     """Check if a file or directory should be excluded."""
     if is_dir:
-        # Exclude hidden directories (starting with .)
-        if name.startswith('.'):
-            return True
-        return name in EXCLUDE_DIRS
+        # Exclude hidden directories (starting with .) - names from scandir are never empty
+        return name[0] == '.' or name in EXCLUDE_DIRS
     return name in EXCLUDE_FILES
 
-def check_has_tests(file_path: Path) -> bool:
-    """Check if a test file exists for the given source file."""
-    # Common test file patterns
-    patterns = [
-        file_path.with_suffix('.test' + file_path.suffix),
-        file_path.with_suffix('.spec' + file_path.suffix),
-        file_path.parent / '__tests__' / file_path.name,
-        file_path.parent / '__tests__' / file_path.with_suffix('.test' + file_path.suffix).name,
-        file_path.parent / '__tests__' / file_path.with_suffix('.spec' + file_path.suffix).name,
-    ]
+# Names in each directory looked at by check_has_tests, listed once per directory;
+# cleared at the start of every generate_compact_index() run
+_dir_cache: Dict[str, frozenset] = {}
 
-    return any(p.exists() for p in patterns)
+def _entries(directory: str) -> frozenset:
+    """Return the names in a directory (empty if it does not exist), cached per directory."""
+    names = _dir_cache.get(directory)
+    if names is None:
+        try:
+            names = frozenset(os.listdir(directory))
+        except OSError:
+            names = frozenset()
+        _dir_cache[directory] = names
+    return names
 
-def analyze_typescript_file(content: str, file_path: Path) -> FileAnalysis:
-    """Analyze TypeScript/JavaScript file."""
+def check_has_tests(file_path: str) -> bool:
+    """Check if a test file exists for the given source file."""
+    # Common test file patterns, checked against cached directory listings
+    # instead of one stat() per candidate; names are built with plain string
+    # operations since this runs for every code file
+    parent, name = os.path.split(file_path)
+    # A bare file name is relative to the current directory
+    parent = parent or os.curdir
+    stem, _, ext = name.rpartition('.')
+    test_name = f"{stem}.test.{ext}"
+    spec_name = f"{stem}.spec.{ext}"
+
+    parent_entries = _entries(parent)
+    if test_name in parent_entries or spec_name in parent_entries:
+        return True
+    if '__tests__' not in parent_entries:
+        return False
+
+    tests_entries = _entries(os.path.join(parent, '__tests__'))
+    return name in tests_entries or test_name in tests_entries or spec_name in tests_entries
+
+def _text(value: bytes) -> str:
+    """Decode a captured group, dropping invalid UTF-8 like the old text-mode read did."""
+    return value.decode('utf-8', 'ignore')
+
+def analyze_typescript_file(content: bytes, file_path: str) -> FileAnalysis:
+    """Analyze TypeScript/JavaScript file (raw bytes or a memory map)."""
     analysis = FileAnalysis()
+    default_exports = []
+    types = {'iface': [], 'type': [], 'enum': []}
+    arrow_functions = []
 
-    # Extract imports (local files only - starting with ./ or ../)
-    import_pattern = r'import\s+.*?\s+from\s+[\'"](\.[^\'"]+)[\'"]'
-    for match in re.finditer(import_pattern, content):
-        import_path = match.group(1)
-        analysis.imports.append(import_path)
-
-    # Extract exports (named exports)
-    export_pattern = r'export\s+(?:const|let|var|function|class|interface|type|enum)\s+(\w+)'
-    for match in re.finditer(export_pattern, content):
-        analysis.exports.append(match.group(1))
-
-    # Extract default exports
-    default_export_pattern = r'export\s+default\s+(\w+)'
-    for match in re.finditer(default_export_pattern, content):
-        analysis.exports.append(f"default: {match.group(1)}")
-
-    # Extract interfaces
-    interface_pattern = r'(export\s+)?interface\s+(\w+)'
-    for match in re.finditer(interface_pattern, content):
-        is_exported = match.group(1) is not None
-        analysis.types.append(TypeInfo(
-            name=match.group(2),
-            kind='interface',
-            is_exported=is_exported
-        ))
-
-    # Extract type aliases
-    type_pattern = r'(export\s+)?type\s+(\w+)'
-    for match in re.finditer(type_pattern, content):
-        is_exported = match.group(1) is not None
-        analysis.types.append(TypeInfo(
-            name=match.group(2),
-            kind='type',
-            is_exported=is_exported
-        ))
-
-    # Extract enums
-    enum_pattern = r'(export\s+)?enum\s+(\w+)'
-    for match in re.finditer(enum_pattern, content):
-        is_exported = match.group(1) is not None
-        analysis.types.append(TypeInfo(
-            name=match.group(2),
-            kind='enum',
-            is_exported=is_exported
-        ))
-
-    # Extract classes
-    class_pattern = r'(export\s+)?class\s+(\w+)'
-    for match in re.finditer(class_pattern, content):
-        is_exported = match.group(1) is not None
-        class_name = match.group(2)
-
-        # Find class methods (simplified - looks for methods within ~500 chars of class declaration)
-        class_pos = match.end()
-        class_section = content[class_pos:class_pos+2000]
-        method_pattern = r'(?:public|private|protected)?\s*(async\s+)?(\w+)\s*\(([^)]*)\)(?:\s*:\s*([^\{]+))?\s*\{'
-        methods = []
-        for method_match in re.finditer(method_pattern, class_section):
-            is_async = method_match.group(1) is not None
-            method_name = method_match.group(2)
-            params = method_match.group(3).strip()
-            return_type = method_match.group(4).strip() if method_match.group(4) else ''
-
-            # Skip constructor
-            if method_name in ['constructor', class_name]:
-                continue
-
-            signature = f"({params})"
-            if return_type:
-                signature += f": {return_type}"
-
-            methods.append(FunctionInfo(
-                name=method_name,
-                signature=signature,
-                is_async=is_async,
-                is_exported=False
-            ))
-
-        analysis.classes.append(ClassInfo(
-            name=class_name,
-            methods=methods,
-            is_exported=is_exported
-        ))
-
-    # Extract standalone functions
-    func_patterns = [
-        r'(export\s+)?(async\s+)?function\s+(\w+)\s*\(([^)]*)\)(?:\s*:\s*([^\{]+))?\s*\{',
-        r'(export\s+)?(?:const|let|var)\s+(\w+)\s*=\s*(async\s+)?\(([^)]*)\)(?:\s*:\s*([^\=\>]+))?\s*=>',
-    ]
+    # Only constructs whose keywords occur in the file are looked for
+    kinds = _active_constructs(content, _TS_CONSTRUCTS)
 
-    for pattern in func_patterns:
-        for match in re.finditer(pattern, content):
-            groups = match.groups()
-            if len(groups) == 5:  # function declaration
-                is_exported = groups[0] is not None
-                is_async = groups[1] is not None
-                func_name = groups[2]
-                params = groups[3].strip()
-                return_type = groups[4].strip() if groups[4] else ''
-            else:  # arrow function
-                is_exported = groups[0] is not None
-                func_name = groups[1]
-                is_async = groups[2] is not None
-                params = groups[3].strip()
-                return_type = groups[4].strip() if groups[4] else ''
-
-            signature = f"({params})"
-            if return_type:
-                signature += f": {return_type}"
-
-            analysis.functions.append(FunctionInfo(
-                name=func_name,
-                signature=signature,
-                is_async=is_async,
-                is_exported=is_exported
-            ))
+    # End of the last accepted match per construct - a construct never overlaps
+    # its own previous match, the same as a separate finditer() per pattern
+    ends = dict.fromkeys(kinds, 0)
 
+    for match in _scan(_TS_SCAN_RE, _TS_KEYWORDS, content) if kinds else ():
+        pos = match.start()
+        for kind in kinds:
+            if pos < ends[kind] or match.start(kind) < 0:
+                continue
+            ends[kind] = match.end(kind)
+
+            if kind == 'imp':
+                # Local imports only - starting with ./ or ../
+                analysis.imports.append(_text(match.group('imp_path')))
+            elif kind == 'exp':
+                analysis.exports.append(_text(match.group('exp_name')))
+            elif kind == 'dflt':
+                default_exports.append(f"default: {_text(match.group('dflt_name'))}")
+            elif kind in types:
+                types[kind].append(TypeInfo(
+                    name=_text(match.group(kind + '_name')),
+                    kind=_TS_TYPE_KINDS[kind],
+                    is_exported=match.group(kind + '_exp') is not None
+                ))
+            elif kind == 'cls':
+                class_name = _text(match.group('cls_name'))
+
+                # Find class methods - members of the class body, not blocks nested in them
+                body_start, body_end, member_braces = _typescript_class_body(content, match.start('cls'), match.end('cls'))
+                methods = []
+                for method_match in _TS_METHOD_RE.finditer(content, body_start, body_end):
+                    if method_match.end() - 1 not in member_braces:
+                        continue
+                    method_name = _text(method_match.group(2))
+
+                    # Skip constructor
+                    if method_name in ['constructor', class_name]:
+                        continue
+
+                    method = _typescript_function(method_name, method_match.group(3), method_match.group(4))
+                    method.is_async = method_match.group(1) is not None
+                    methods.append(method)
+
+                analysis.classes.append(ClassInfo(
+                    name=class_name,
+                    methods=methods,
+                    is_exported=match.group('cls_exp') is not None
+                ))
+            else:
+                # Standalone function declaration or arrow function
+                func = _typescript_function(
+                    _text(match.group(kind + '_name')),
+                    match.group(kind + '_params'),
+                    match.group(kind + '_ret')
+                )
+                func.is_async = match.group(kind + '_async') is not None
+                func.is_exported = match.group(kind + '_exp') is not None
+                if kind == 'func':
+                    analysis.functions.append(func)
+                else:
+                    arrow_functions.append(func)
+
+    analysis.exports.extend(default_exports)
+    analysis.types = types['iface'] + types['type'] + types['enum']
+    analysis.functions.extend(arrow_functions)
     analysis.has_tests = check_has_tests(file_path)
     return analysis
 
-def analyze_python_file(content: str, file_path: Path) -> FileAnalysis:
-    """Analyze Python file."""
-    analysis = FileAnalysis()
+def _typescript_class_body(content: bytes, start: int, pos: int) -> Tuple[int, int, Set[int]]:
+    """
+    Locate the body of the class declaration spanning `start`:`pos` (up to its name).
 
-    # Extract imports (local/relative imports)
-    import_pattern = r'from\s+(\.[^\s]+)\s+import'
-    for match in re.finditer(import_pattern, content):
-        analysis.imports.append(match.group(1))
-
-    # Extract classes
-    class_pattern = r'class\s+(\w+)'
-    for match in re.finditer(class_pattern, content):
-        class_name = match.group(1)
-
-        # Find methods
-        class_pos = match.end()
-        class_section = content[class_pos:class_pos+2000]
-        method_pattern = r'(?:async\s+)?def\s+(\w+)\s*\(([^)]*)\)(?:\s*->\s*([^:]+))?:'
-        methods = []
-        for method_match in re.finditer(method_pattern, class_section):
-            is_async = 'async' in method_match.group(0)
-            method_name = method_match.group(1)
-            params = method_match.group(2).strip()
-            return_type = method_match.group(3).strip() if method_match.group(3) else ''
-
-            # Skip dunder methods except __init__
-            if method_name.startswith('__') and method_name != '__init__':
-                continue
+    The body runs from its opening `{` to the matching `}`, skipping braces in
+    comments, string and regex literals. A `class` word that is not followed by
+    a body, or that is in a comment, yields an empty range.
 
-            signature = f"({params})"
-            if return_type:
-                signature += f" -> {return_type}"
-
-            methods.append(FunctionInfo(
-                name=method_name,
-                signature=signature,
-                is_async=is_async,
-                is_exported=False
-            ))
-
-        analysis.classes.append(ClassInfo(
-            name=class_name,
-            methods=methods,
-            is_exported=False
-        ))
-
-    # Extract standalone functions
-    func_pattern = r'(?:async\s+)?def\s+(\w+)\s*\(([^)]*)\)(?:\s*->\s*([^:]+))?:'
-    for match in re.finditer(func_pattern, content):
-        is_async = 'async' in match.group(0)
-        func_name = match.group(1)
-        params = match.group(2).strip()
-        return_type = match.group(3).strip() if match.group(3) else ''
-
-        # Skip if it's a method (already captured)
-        if func_name in [m.name for c in analysis.classes for m in c.methods]:
+    Returns:
+        (body_start, body_end, offsets of the `{` opening each member's block)
+    """
+    member_braces = set()
+    line_start = content.rfind(b'\n', 0, start) + 1
+    body_start = None
+    if not _TS_COMMENT_LINE_RE.search(content[line_start:start]):
+        body_start = _typescript_class_header(content, pos)
+    if body_start is None:
+        return pos, pos, member_braces
+
+    depth = 0
+    pos = body_start - 1
+    while True:
+        token = _TS_BRACE_RE.search(content, pos)
+        if token is None:
+            break
+        pos = token.end()
+        if token.end() - token.start() != 1:
+            if content[token.start()] == 0x2f and content[token.start() + 1] not in b'/*':
+                # `/.../` is a regex literal only where an expression can start;
+                # after an operand it is a division, and after `<` it is a JSX
+                # closing tag (`</span>`), so rescan just past the `/`
+                before = content[max(0, token.start() - 24):token.start()]
+                if before.endswith(b'<') or (
+                    _TS_DIVISION_PREFIX_RE.search(before) and not _TS_REGEX_KEYWORD_RE.search(before)
+                ):
+                    pos = token.start() + 1
             continue
+        if token.group() == b'{':
+            depth += 1
+            if depth == 2:
+                member_braces.add(token.start())
+        else:
+            depth -= 1
+            if depth == 0:
+                return body_start, token.start(), member_braces
+
+    # Unbalanced braces - the body runs to the end of the file
+    return body_start, len(content), member_braces
+
+def _typescript_class_header(content: bytes, pos: int) -> Optional[int]:
+    """
+    Return the offset just past the `{` opening the body of the class whose name ends at `pos`.
 
-        signature = f"({params})"
-        if return_type:
-            signature += f" -> {return_type}"
-
-        analysis.functions.append(FunctionInfo(
-            name=func_name,
-            signature=signature,
-            is_async=is_async,
-            is_exported=False
-        ))
+    Braces nested in `<...>` or `(...)` - e.g. the inline props type of
+    `class Card extends Component<{ title: string }> {` - belong to the header.
+    A `;` or `}` outside such braces means the `class` word does not declare a
+    body, even after an unmatched `<` (e.g. `a < b;`).
+    """
+    depth = 0
+    braces = 0
+    for token in _TS_CLASS_HEADER_RE.finditer(content, pos):
+        if token.end() - token.start() != 1:
+            # `=>`, a comment or a string literal
+            continue
+        bracket = token.group()
+        if bracket == b'{':
+            if depth == 0 and braces == 0:
+                return token.end()
+            braces += 1
+        elif bracket in (b';', b'}'):
+            if braces == 0:
+                return None
+            if bracket == b'}':
+                braces -= 1
+        elif bracket in (b'<', b'('):
+            depth += 1
+        elif depth:
+            depth -= 1
+    return None
+
+def _typescript_function(name: str, params: bytes, return_type: Optional[bytes]) -> FunctionInfo:
+    """Build a FunctionInfo from the captured name, parameters and return type."""
+    signature = f"({_text(params).strip()})"
+    return_type = _text(return_type).strip() if return_type else ''
+    if return_type:
+        signature += f": {return_type}"
+    return FunctionInfo(name=name, signature=signature)
+
+def analyze_python_file(content: bytes, file_path: str) -> FileAnalysis:
+    """Analyze Python file (raw bytes or a memory map)."""
+    analysis = FileAnalysis()
+    func_matches = []
+    # Only constructs whose keywords occur in the file are looked for
+    kinds = _active_constructs(content, _PY_CONSTRUCTS)
+    ends = dict.fromkeys(kinds, 0)
+
+    for match in _scan(_PY_SCAN_RE, _PY_KEYWORDS, content) if kinds else ():
+        pos = match.start()
+        for kind in kinds:
+            if pos < ends[kind] or match.start(kind) < 0:
+                continue
+            ends[kind] = match.end(kind)
+
+            if kind == 'imp':
+                # Local/relative imports
+                analysis.imports.append(_text(match.group('imp_path')))
+            elif kind == 'cls':
+                # Find methods - statements of the class body, not functions nested in them
+                body_start, body_end, member_indent = _python_class_body(content, match.start('cls'), match.end('cls'))
+                # No methods to look for in a file without any `def`
+                if 'func' not in kinds:
+                    body_end = body_start
+                methods = []
+                for method_match in _PY_METHOD_RE.finditer(content, body_start, body_end):
+                    def_pos = method_match.start()
+                    line_start = content.rfind(b'\n', 0, def_pos) + 1
+                    if def_pos - line_start != member_indent or content[line_start:def_pos].strip(b' \t'):
+                        continue
+                    method_name = _text(method_match.group(1))
+
+                    # Skip dunder methods except __init__
+                    if method_name.startswith('__') and method_name != '__init__':
+                        continue
+
+                    methods.append(_python_function(method_match, method_name, 2, 3))
+
+                analysis.classes.append(ClassInfo(
+                    name=_text(match.group('cls_name')),
+                    methods=methods,
+                    is_exported=False
+                ))
+            else:
+                # Standalone functions are resolved once all methods are known
+                func_matches.append(match)
+
+    # Skip functions that are methods (already captured)
+    method_names = {m.name for c in analysis.classes for m in c.methods}
+    for match in func_matches:
+        func_name = _text(match.group('func_name'))
+        if func_name in method_names:
+            continue
+        analysis.functions.append(_python_function(match, func_name, 'func_params', 'func_ret', 'func'))
 
     analysis.has_tests = check_has_tests(file_path)
     return analysis
 
-def analyze_file(file_path: Path) -> Optional[FileAnalysis]:
+def _python_class_body(content: bytes, start: int, pos: int) -> Tuple[int, int, int]:
+    """
+    Locate the body of the class statement spanning `start`:`pos` (up to its name).
+
+    The body ends before the first following line that is indented no deeper
+    than the `class` keyword, ignoring blank and comment lines and the lines of
+    triple-quoted strings. A `class` word
+    that does not start a statement (e.g. in a docstring) yields an empty range.
+
+    Returns:
+        (body_start, body_end, indentation of the body's statements or -1)
+    """
+    line_start = content.rfind(b'\n', 0, start) + 1
+    indent = start - line_start
+    header = _PY_CLASS_HEADER_RE.match(content, pos)
+    if header is None or content[line_start:start].strip(b' \t'):
+        return pos, pos, -1
+
+    dedent_re = _PY_DEDENT_RES.get(indent)
+    if dedent_re is None:
+        dedent_re = _PY_DEDENT_RES[indent] = re.compile(rb'\n[ \t]{0,%d}(?=[^ \t\r\n#])' % indent)
+
+    # A dedented line inside a triple-quoted string (e.g. SQL or a docstring
+    # flush with the margin) does not end the body - skip past such strings
+    pos = header.end()
+    dedent = dedent_re.search(content, pos)
+    while dedent:
+        quote = _PY_TRIPLE_QUOTE_RE.search(content, pos, dedent.start())
+        if quote is None:
+            break
+        pos = content.find(quote.group(), quote.end())
+        if pos < 0:
+            dedent = None
+            break
+        pos += 3
+        if dedent.start() < pos:
+            dedent = dedent_re.search(content, pos)
+    body_end = dedent.start() if dedent else len(content)
+
+    # Statements of a block body share the indentation of its first line
+    first_line = _PY_STATEMENT_LINE_RE.search(content, header.end(), body_end)
+    member_indent = len(first_line.group(1)) if first_line else -1
+    return header.end(), body_end, member_indent
+
+def _python_function(match: re.Match, name: str, params_group, return_group, whole_group=0) -> FunctionInfo:
+    """Build a FunctionInfo from a Python `def` match."""
+    params = _text(match.group(params_group)).strip()
+    return_type = _text(match.group(return_group)).strip() if match.group(return_group) else ''
+
+    signature = f"({params})"
+    if return_type:
+        signature += f" -> {return_type}"
+
+    return FunctionInfo(
+        name=name,
+        signature=signature,
+        is_async=b'async' in match.group(whole_group),
+        is_exported=False
+    )
+
+def analyze_file(file_path: str) -> Optional[FileAnalysis]:
     """
     Comprehensively analyze a code file.
 
@@ -311,17 +603,38 @@ def analyze_file(file_path: Path) -> Optional[FileAnalysis]:
     Returns:
         FileAnalysis object or None if not a code file
     """
-    ext = file_path.suffix.lower()
+    ext = os.path.splitext(file_path)[1].lower()
 
     if ext not in CODE_EXTENSIONS:
         return None
 
+    # Patterns are ASCII bytes patterns, so files are scanned without decoding;
+    # only captured names are decoded
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
+        f = open(file_path, 'rb')
     except Exception:
         return None
 
+    with f:
+        try:
+            content = f.read(MMAP_MIN_SIZE)
+            if len(content) == MMAP_MIN_SIZE:
+                # Large file - scan it in place rather than copying it into memory
+                try:
+                    content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except (OSError, ValueError):
+                    content += f.read()
+        except Exception:
+            return None
+
+        try:
+            return _analyze_content(content, ext, file_path)
+        finally:
+            if isinstance(content, mmap.mmap):
+                content.close()
+
+def _analyze_content(content: bytes, ext: str, file_path: str) -> FileAnalysis:
+    """Dispatch the content of a code file to the analyzer of its language."""
     if ext in {'.ts', '.tsx', '.js', '.jsx'}:
         return analyze_typescript_file(content, file_path)
     elif ext == '.py':
@@ -330,7 +643,125 @@ def analyze_file(file_path: Path) -> Optional[FileAnalysis]:
         # For other languages, return basic analysis
         return FileAnalysis(has_tests=check_has_tests(file_path))
 
-def generate_compact_index(directory: Path, project_root: Path, output_file=None):
+def analyze_files(entries: List[IndexEntry], cache: Optional[AnalysisCache] = None) -> List[Optional[FileAnalysis]]:
+    """
+    Analyze the given files, spreading them over worker processes when there are many.
+
+    Args:
+        entries: Files to analyze (non-code files and unreadable directory entries are skipped)
+        cache: Analysis cache; files unchanged since the previous run are not re-analyzed
+
+    Returns:
+        One FileAnalysis (or None if not a code file) per entry, in the same order
+    """
+    analyses: List[Optional[FileAnalysis]] = [None] * len(entries)
+    pending = []
+    for i, entry in enumerate(entries):
+        # Non-code files are neither dispatched to a worker nor cached
+        if not entry.is_code:
+            continue
+
+        cached = cache.previous.get(entry.rel_path) if cache is not None else None
+        if cached is not None and cached[:2] == (entry.mtime_ns, entry.size):
+            analysis = cached[2]
+            # Test files may have been added or removed since the file was analyzed
+            if analysis:
+                analysis.has_tests = check_has_tests(entry.path)
+            analyses[i] = analysis
+        else:
+            pending.append(i)
+
+    paths = [entries[i].path for i in pending]
+    results = None
+    if len(paths) >= PARALLEL_MIN_FILES and (os.cpu_count() or 1) > 1:
+        try:
+            with ProcessPoolExecutor() as executor:
+                results = list(executor.map(analyze_file, paths, chunksize=32))
+        except (OSError, NotImplementedError, BrokenProcessPool):
+            # Worker processes are unavailable - fall back to analyzing in-process
+            results = None
+    if results is None:
+        results = [analyze_file(path) for path in paths]
+
+    for i, analysis in zip(pending, results):
+        analyses[i] = analysis
+
+    if cache is not None:
+        for entry, analysis in zip(entries, analyses):
+            if entry.is_code:
+                cache.current[entry.rel_path] = (entry.mtime_ns, entry.size, analysis)
+    return analyses
+
+# Fields of a FunctionInfo, in constructor order, as stored in the analysis cache
+_FUNCTION_FIELDS = attrgetter('name', 'signature', 'is_async', 'is_exported')
+
+def _analysis_to_json(analysis: Optional[FileAnalysis]) -> Optional[list]:
+    """Convert a FileAnalysis into the plain lists stored in the analysis cache."""
+    if analysis is None:
+        return None
+    return [
+        analysis.imports,
+        analysis.exports,
+        [[c.name, [list(_FUNCTION_FIELDS(m)) for m in c.methods], c.is_exported] for c in analysis.classes],
+        [list(_FUNCTION_FIELDS(f)) for f in analysis.functions],
+        [[t.name, t.kind, t.is_exported] for t in analysis.types],
+        analysis.has_tests,
+    ]
+
+def _analysis_from_json(data: Optional[list]) -> Optional[FileAnalysis]:
+    """Rebuild a FileAnalysis from its cached lists (raises TypeError/ValueError if malformed)."""
+    if data is None:
+        return None
+    imports, exports, classes, functions, types, has_tests = data
+    return FileAnalysis(
+        imports=list(imports),
+        exports=list(exports),
+        classes=[
+            ClassInfo(name, [FunctionInfo(*m) for m in methods], is_exported)
+            for name, methods, is_exported in classes
+        ],
+        functions=[FunctionInfo(*f) for f in functions],
+        types=[TypeInfo(*t) for t in types],
+        has_tests=has_tests,
+    )
+
+def load_analysis_cache(cache_path: Path) -> AnalysisCache:
+    """Load the analysis cache, starting empty if it is missing, stale or unreadable."""
+    try:
+        with open(cache_path, 'rb') as f:
+            version, entries = json.load(f)
+        if version != CACHE_VERSION or not isinstance(entries, dict):
+            return AnalysisCache()
+        previous = {
+            rel_path: (mtime_ns, size, _analysis_from_json(analysis))
+            for rel_path, (mtime_ns, size, analysis) in entries.items()
+        }
+    except Exception:
+        return AnalysisCache()
+    return AnalysisCache(previous=previous)
+
+def save_analysis_cache(cache_path: Path, cache: AnalysisCache):
+    """Save the entries seen in this run, dropping files that no longer exist."""
+    tmp_path = cache_path.with_name(cache_path.name + '.tmp')
+    try:
+        entries = {
+            rel_path: (mtime_ns, size, _analysis_to_json(analysis))
+            for rel_path, (mtime_ns, size, analysis) in cache.current.items()
+        }
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            # dumps() encodes in one go; dump() writes each small chunk separately
+            f.write(json.dumps((CACHE_VERSION, entries), separators=(',', ':')))
+        os.replace(tmp_path, cache_path)
+    except Exception:
+        # The cache is only an optimization - never fail the run because of it,
+        # and don't leave a partial file behind
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+def generate_compact_index(directory: Path, project_root: Path, output_file=None,
+                           cache: Optional[AnalysisCache] = None, counts: Optional[List[int]] = None):
     """
     Generate a compact, machine-readable index of the directory with comprehensive code analysis.
 
@@ -346,72 +777,117 @@ def generate_compact_index(directory: Path, project_root: Path, output_file=None
     Args:
         directory: Path to the directory to map
         project_root: Path to project root for relative path calculation
-        output_file: File object to write to (defaults to stdout)
+        output_file: Binary file object to write to (defaults to stdout)
+        cache: Analysis cache used to skip unchanged files (optional)
+        counts: [total_files, total_dirs] list incremented while walking (optional)
     """
     if output_file is None:
-        output_file = sys.stdout
+        output_file = sys.stdout.buffer
+
+    # Directory listings of a previous run may be stale (e.g. new test files)
+    _dir_cache.clear()
+
+    # Relative paths are sliced off the walked paths, which all start with the
+    # project root prefix when the directory is inside the project
+    directory_str = str(directory)
+    root_prefix = os.path.join(str(project_root), '')
+    prefix_len = len(root_prefix) if os.path.join(directory_str, '').startswith(root_prefix) else 0
+
+    # Walk the whole tree first so that all files can be analyzed in parallel,
+    # then write the records in walk order
+    entries: List[IndexEntry] = []
+    collect_entries(directory_str, prefix_len, entries, counts if counts is not None else [0, 0])
+    analyses = analyze_files(entries, cache)
+
+    # Records are encoded into one buffer, a file at a time, and written with a
+    # single write(). Paths that are not valid UTF-8 keep their bytes on disk.
+    buffer = bytearray()
+    for entry, analysis in zip(entries, analyses):
+        if entry.permission_denied:
+            buffer += f"ERROR|{entry.path}|Permission Denied\n".encode('utf-8', 'surrogateescape')
+            continue
 
-    try:
-        # Get all entries in the directory
-        entries = sorted(directory.iterdir(), key=lambda x: (not x.is_dir(), x.name.lower()))
+        rel_path = entry.rel_path
+
+        # Write file entry
+        has_tests = "true" if analysis and analysis.has_tests else "false"
+        lines = [f"FILE|{rel_path}|{entry.size}|{has_tests}\n"]
+
+        # Write detailed analysis if available (same limits as old format)
+        if analysis:
+            # Imports (limit 5, same as old format)
+            for import_path in analysis.imports[:5]:
+                lines.append(f"IMPORT|{rel_path}|{import_path}\n")
+
+            # Exports (limit 10, same as old format)
+            for export_name in analysis.exports[:10]:
+                lines.append(f"EXPORT|{rel_path}|{export_name}\n")
+
+            # Types/Interfaces/Enums (no limit, same as old format)
+            for type_info in analysis.types:
+                is_exported = "1" if type_info.is_exported else "0"
+                lines.append(f"TYPE|{rel_path}|{type_info.name}|{type_info.kind}|{is_exported}\n")
+
+            # Classes (no limit, same as old format)
+            for class_info in analysis.classes:
+                is_exported = "1" if class_info.is_exported else "0"
+                lines.append(f"CLASS|{rel_path}|{class_info.name}|{is_exported}\n")
+
+                # Methods of the class (limit 10, same as old format)
+                for method in class_info.methods[:10]:
+                    is_async = "1" if method.is_async else "0"
+                    lines.append(f"METHOD|{rel_path}|{class_info.name}|{method.name}|{is_async}\n")
+
+            # Functions (limit 15, same as old format)
+            for func in analysis.functions[:15]:
+                is_async = "1" if func.is_async else "0"
+                is_exported = "1" if func.is_exported else "0"
+                lines.append(f"FUNC|{rel_path}|{func.name}|{is_async}|{is_exported}\n")
+
+        buffer += ''.join(lines).encode('utf-8', 'surrogateescape')
 
-        # Filter out excluded items
-        entries = [e for e in entries if not should_exclude(e.name, e.is_dir())]
+    output_file.write(buffer)
 
-        for entry in entries:
-            if entry.is_dir():
+def collect_entries(directory: str, prefix_len: int, entries: List[IndexEntry], counts: List[int]):
+    """
+    Recursively collect the files of a directory in index order.
+
+    Directories come before files, both sorted case-insensitively by name.
+
+    Args:
+        directory: Path to the directory to walk
+        prefix_len: Length of the project root prefix to strip from paths (0 keeps them absolute)
+        entries: List the found files are appended to
+        counts: [total_files, total_dirs] list incremented for every file and directory found
+    """
+    try:
+        # Get all entries in the directory - scandir's DirEntry caches the file
+        # type from the directory listing, so is_dir() needs no extra stat()
+        # Excluded items are filtered out before sorting, so they are never compared
+        with os.scandir(directory) as it:
+            children = [e for e in it if not should_exclude(e.name, e.is_dir())]
+        children.sort(key=lambda x: (not x.is_dir(), x.name.lower()))
+
+        for child in children:
+            if child.is_dir():
                 # Recursively process subdirectory
-                generate_compact_index(entry, project_root, output_file)
+                counts[1] += 1
+                collect_entries(child.path, prefix_len, entries, counts)
             else:
-                # Get relative path from project root
-                try:
-                    rel_path = entry.relative_to(project_root)
-                except ValueError:
-                    rel_path = entry
-
-                # Get file size
-                size = entry.stat().st_size
-
-                # Analyze code files
-                analysis = analyze_file(entry)
-
-                # Write file entry
-                has_tests = "true" if analysis and analysis.has_tests else "false"
-                output_file.write(f"FILE|{rel_path}|{size}|{has_tests}\n")
-
-                # Write detailed analysis if available (same limits as old format)
-                if analysis:
-                    # Imports (limit 5, same as old format)
-                    for import_path in analysis.imports[:5]:
-                        output_file.write(f"IMPORT|{rel_path}|{import_path}\n")
-
-                    # Exports (limit 10, same as old format)
-                    for export_name in analysis.exports[:10]:
-                        output_file.write(f"EXPORT|{rel_path}|{export_name}\n")
-
-                    # Types/Interfaces/Enums (no limit, same as old format)
-                    for type_info in analysis.types:
-                        is_exported = "1" if type_info.is_exported else "0"
-                        output_file.write(f"TYPE|{rel_path}|{type_info.name}|{type_info.kind}|{is_exported}\n")
-
-                    # Classes (no limit, same as old format)
-                    for class_info in analysis.classes:
-                        is_exported = "1" if class_info.is_exported else "0"
-                        output_file.write(f"CLASS|{rel_path}|{class_info.name}|{is_exported}\n")
-
-                        # Methods of the class (limit 10, same as old format)
-                        for method in class_info.methods[:10]:
-                            is_async = "1" if method.is_async else "0"
-                            output_file.write(f"METHOD|{rel_path}|{class_info.name}|{method.name}|{is_async}\n")
-
-                    # Functions (limit 15, same as old format)
-                    for func in analysis.functions[:15]:
-                        is_async = "1" if func.is_async else "0"
-                        is_exported = "1" if func.is_exported else "0"
-                        output_file.write(f"FUNC|{rel_path}|{func.name}|{is_async}|{is_exported}\n")
+                if child.is_file():
+                    counts[0] += 1
+
+                stat_result = child.stat()
+                entries.append(IndexEntry(
+                    path=child.path,
+                    rel_path=child.path[prefix_len:],
+                    size=stat_result.st_size,
+                    mtime_ns=stat_result.st_mtime_ns,
+                    is_code=os.path.splitext(child.name)[1].lower() in CODE_EXTENSIONS
+                ))
 
     except PermissionError:
-        output_file.write(f"ERROR|{directory}|Permission Denied\n")
+        entries.append(IndexEntry(path=directory, permission_denied=True))
 
 def format_size(size_bytes: int) -> str:
     """Format file size in human-readable format."""
@@ -421,31 +897,6 @@ def format_size(size_bytes: int) -> str:
         size_bytes /= 1024.0
     return f"{size_bytes:.1f}TB"
 
-def count_items(directory: Path) -> Tuple[int, int]:
-    """Count total files and directories (excluding hidden folders and their contents)."""
-    total_files = 0
-    total_dirs = 0
-
-    def count_recursive(path: Path):
-        nonlocal total_files, total_dirs
-        try:
-            for entry in path.iterdir():
-                # Skip if excluded
-                if should_exclude(entry.name, entry.is_dir()):
-                    continue
-
-                if entry.is_file():
-                    total_files += 1
-                elif entry.is_dir():
-                    total_dirs += 1
-                    # Recursively count subdirectory
-                    count_recursive(entry)
-        except PermissionError:
-            pass
-
-    count_recursive(directory)
-    return total_files, total_dirs
-
 def main():
     # Get the project root (1 level up from agent-tools/architecture-overview.py)
     script_path = Path(__file__).resolve()
@@ -453,33 +904,43 @@ def main():
 
     # Output file path
     output_path = project_root / 'PROJECT_MAP.txt'
+    cache_path = project_root / CACHE_FILENAME
 
     print(f"Generating compact project map for: {project_root}")
     print(f"Output will be saved to: {output_path}")
 
-    # Count items first
-    print("Counting files and directories...")
-    total_files, total_dirs = count_items(project_root)
-
-    # Generate the compact index
-    with open(output_path, 'w', encoding='utf-8') as f:
-        # Write compact header (minimal)
-        f.write(f"# PROJECT_MAP: {project_root.name}\n")
-        f.write(f"# Total Directories: {total_dirs} | Total Files: {total_files}\n")
-        f.write(f"# Excluded: Hidden dirs (.*), node_modules, dist, build, etc.\n")
-        f.write(f"# Supported: TypeScript, JavaScript, Python\n")
-        f.write(f"# Format: TYPE|field1|field2|...\n")
-        f.write(f"#   FILE|path|size_bytes|has_tests\n")
-        f.write(f"#   IMPORT|file|import_path\n")
-        f.write(f"#   EXPORT|file|export_name\n")
-        f.write(f"#   TYPE|file|name|kind|is_exported\n")
-        f.write(f"#   CLASS|file|name|is_exported\n")
-        f.write(f"#   METHOD|file|class|name|is_async\n")
-        f.write(f"#   FUNC|file|name|is_async|is_exported\n")
-        f.write(f"# ---\n")
-
-        # Generate compact index
-        generate_compact_index(project_root, project_root, f)
+    # Load analysis results of the previous run
+    cache = load_analysis_cache(cache_path)
+
+    # Generate the compact index into memory first - the header needs the
+    # totals, which are counted while walking the tree
+    buffer = io.BytesIO()
+    counts = [0, 0]
+    generate_compact_index(project_root, project_root, buffer, cache, counts)
+    total_files, total_dirs = counts
+
+    # Compact header (minimal)
+    header = (
+        f"# PROJECT_MAP: {project_root.name}\n"
+        f"# Total Directories: {total_dirs} | Total Files: {total_files}\n"
+        f"# Excluded: Hidden dirs (.*), node_modules, dist, build, etc.\n"
+        f"# Supported: TypeScript, JavaScript, Python\n"
+        f"# Format: TYPE|field1|field2|...\n"
+        f"#   FILE|path|size_bytes|has_tests\n"
+        f"#   IMPORT|file|import_path\n"
+        f"#   EXPORT|file|export_name\n"
+        f"#   TYPE|file|name|kind|is_exported\n"
+        f"#   CLASS|file|name|is_exported\n"
+        f"#   METHOD|file|class|name|is_async\n"
+        f"#   FUNC|file|name|is_async|is_exported\n"
+        f"# ---\n"
+    )
+
+    with open(output_path, 'wb') as f:
+        f.write(header.encode('utf-8', 'surrogateescape'))
+        f.write(buffer.getbuffer())
+
+    save_analysis_cache(cache_path, cache)
 
     print(f"\n✓ Compact project map generated successfully!")
     print(f"  Location: {output_path}")
@@ -0,0 +1,153 @@
+"""Regression tests for the heuristics of architecture-overview.py."""
+
+import importlib.util
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+_spec = importlib.util.spec_from_file_location(
+    'architecture_overview', Path(__file__).with_name('architecture-overview.py')
+)
+ao = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(ao)
+
+
+class ClassMethodsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def analyze(self, name: str, source: str):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(source)
+        return ao.analyze_file(path)
+
+    def methods(self, name: str, source: str):
+        return {c.name: [m.name for m in c.methods] for c in self.analyze(name, source).classes}
+
+    def test_ts_inline_type_argument_in_header(self):
+        source = (
+            "export class Card extends React.Component<{ title: string; onClick: (e: Event) => void }> {\n"
+            "  handleClick() {\n    return 1;\n  }\n"
+            "  render() {\n    return <div>{this.props.title}</div>;\n  }\n"
+            "}\n"
+        )
+        self.assertEqual(self.methods('card.tsx', source), {'Card': ['handleClick', 'render']})
+
+    def test_ts_braces_in_regex_literals(self):
+        source = (
+            "class Esc {\n"
+            "  pattern = /}/;\n"
+            "  quote(s: string) {\n    return s.replace(/[{]/g, '\\\\{');\n  }\n"
+            "  other(a: number, b: number) {\n    return a / b / 2;\n  }\n"
+            "  third() {\n    return typeof /{/;\n  }\n"
+            "}\n"
+        )
+        self.assertEqual(self.methods('esc.ts', source), {'Esc': ['quote', 'other', 'third']})
+
+    def test_jsx_closing_tags(self):
+        source = (
+            "export class TodoItem extends React.Component<Props> {\n"
+            "  render() {\n"
+            "    return <li><span>{x}</span>{done && <Check />}</li>;\n"
+            "  }\n"
+            "  toggle() {\n    this.setState({ done: !this.state.done });\n  }\n"
+            "}\n"
+        )
+        self.assertEqual(self.methods('todo.tsx', source), {'TodoItem': ['render', 'toggle']})
+
+    def test_call_in_member_body_is_not_a_method(self):
+        source = (
+            "class Agent {\n"
+            "  constructor(opts) {\n    this.x = opts ? omit(opts, 'h') : null; }\n"
+            "  addRequest(req) {\n    return req;\n  }\n"
+            "}\n"
+        )
+        self.assertEqual(self.methods('agent.js', source), {'Agent': ['addRequest']})
+
+    def test_declare_class_without_bodies(self):
+        members = ''.join(f"  method{i}(a: string, b: number): Promise<void>;\n" for i in range(2000))
+        start = time.perf_counter()
+        found = self.methods('api.d.ts', f"export declare class Api {{\n{members}}}\n")
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertEqual(found, {'Api': []})
+
+    def test_class_words_in_comments(self):
+        source = (
+            "/**\n * A subclass that connects through the proxy.\n */\n"
+            "class HttpProxyAgent extends Agent {\n"
+            "  callback(req, opts) {\n    return 1;\n  }\n"
+            "}\n"
+            + "// the class Foo handles a<b\n" * 4000
+        )
+        start = time.perf_counter()
+        found = self.methods('agent.js', source)
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertEqual(found['HttpProxyAgent'], ['callback'])
+        self.assertEqual(found['that'], [])
+        self.assertEqual(found['Foo'], [])
+
+    def test_python_triple_quoted_strings_and_type_parameters(self):
+        source = (
+            "class Q:\n"
+            "    SQL = '''\nSELECT 1\n'''\n"
+            "    def run(self):\n        pass\n"
+            "\n"
+            "class Foo[T: (int, str)](Base[T]):\n"
+            "    def get(self) -> T:\n        pass\n"
+            "\n"
+            "def after():\n    pass\n"
+        )
+        analysis = self.analyze('q.py', source)
+        self.assertEqual({c.name: [m.name for m in c.methods] for c in analysis.classes},
+                         {'Q': ['run'], 'Foo': ['get']})
+        self.assertEqual([f.name for f in analysis.functions], ['after'])
+
+
+class CheckHasTestsTest(unittest.TestCase):
+    def test_bare_relative_path(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ('m.py', 'm.test.py'):
+                open(os.path.join(tmp, name), 'w').close()
+            cwd = os.getcwd()
+            os.chdir(tmp)
+            try:
+                ao._dir_cache.clear()
+                self.assertTrue(ao.check_has_tests('m.py'))
+            finally:
+                os.chdir(cwd)
+                ao._dir_cache.clear()
+
+
+class AnalysisCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / ao.CACHE_FILENAME
+
+    def test_round_trip(self):
+        analysis = ao.FileAnalysis(
+            imports=['./a'],
+            exports=['b'],
+            classes=[ao.ClassInfo('C', [ao.FunctionInfo('m', '(x)', True)], True)],
+            functions=[ao.FunctionInfo('f', '()', False, True)],
+            types=[ao.TypeInfo('T', 'interface', True)],
+            has_tests=True,
+        )
+        cache = ao.AnalysisCache(current={'src/a.ts': (1, 2, analysis), 'src/b.ts': (3, 4, None)})
+        ao.save_analysis_cache(self.path, cache)
+        self.assertEqual(ao.load_analysis_cache(self.path).previous, cache.current)
+        self.assertEqual(os.listdir(self.tmp.name), [ao.CACHE_FILENAME])
+
+    def test_malformed_cache_is_ignored(self):
+        for content in ('not json', '[%d, []]' % ao.CACHE_VERSION, '[%d, {"a.ts": [1, 2, [1]]}]' % ao.CACHE_VERSION,
+                        '{"a": 1}', '[0, {}]'):
+            self.path.write_text(content)
+            self.assertEqual(ao.load_analysis_cache(self.path).previous, {}, content)
+
+
+if __name__ == '__main__':
+    unittest.main()